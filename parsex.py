@@ -1,20 +1,33 @@
 import argparse
+import asyncio
+import bisect
 import csv
+import io
 import json
 import logging
+import os
 import re
 import subprocess
 import sys
 import time
 
 # import warnings
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 from tqdm import tqdm
 
+try:
+    import av  # PyAV: 直接调用 libavformat, 省去每个文件启动 ffprobe 进程的开销
+except ImportError:
+    av = None
+
+try:
+    from orjson import loads as json_loads  # Rust 实现, 解析 ffprobe 输出比标准库快
+except ImportError:
+    from json import loads as json_loads
+
 # 忽略特定类型的警告
 # warnings.filterwarnings("ignore", category=UserWarning)
 
@@ -37,6 +50,42 @@ HEADERS = [
     'comment',
 ]
 
+_SIZE_UNITS = ['B', 'KB', 'MB', 'GB']
+
+# 短边下限 -> 分辨率标签
+_RES_BOUNDS = [480, 540, 720, 1080, 2160]
+_RES_LABELS = ['480p', '540p', '720p', '1080p', '2160p']
+
+# 单次 writev 最多提交的缓冲区个数 (Linux/macOS 的 IOV_MAX)
+_IOV_MAX = 1024
+
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.avi', '.mov', '.wmv')
+
+_FILENAME_RE = re.compile(r'^(.+?)[. ](?:(?:\d{2}[. ]){2}\d{2}|\d{4})[. ](.*)$')
+# ^(.+?)
+#     ^             从头开始匹配
+#     (.+?)         非贪婪匹配, 匹配字符直到遇到第一个符合后面条件的日期格式为止
+#
+# [. ]              匹配点或空格 (文件名中的空格与点同样视为分隔符)
+#
+# (?:(?:\d{2}[. ]){2}\d{2}|\d{4})
+#   外层的 () 是一个捕获组，用来提取完整的日期 (26.01.01)
+#   (?:\d{2}[. ]){2} 匹配前两段日期
+#   \d{2}           匹配最后一段日期
+#   | 或
+#   \d{4}           匹配 4 位数字 (2026)
+#
+# (.*)$             匹配剩下的所有内容直到行尾
+#
+# ?:                不捕获内容
+
+_SEP_RE = re.compile(r'[. ]')
+
+PROBE_CACHE_VERSION = 2
+
+# {absolute path: {'size', 'mtime', 'meta'}}, 文件大小和修改时间不变时直接复用上次的探测结果
+_probe_cache: Dict[str, Dict] = {}
+
 
 # 同时输出到文件和控制台
 def setup_logging(logfile: str):
@@ -60,56 +109,150 @@ def setup_logging(logfile: str):
     # logging.basicConfig(filename=logfile, level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
-def get_existing_records(csv_path: str) -> Dict[str, Dict]:
+def get_existing_names(csv_path: str) -> Set[str]:
     path = Path(csv_path)
-    existing_data = {}
+    existing_names = set()
 
     if path.exists():
         try:
             with open(path, mode='r', newline='', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
+                # 只需要第一列 name; 文件名可能含逗号 (带引号), 所以仍用 csv.reader 而不是 split(',')
+                reader = csv.reader(csvfile)
+                next(reader, None)
                 for row in reader:
-                    if row and row.get('name'):
-                        existing_data[row['name']] = row
-            logging.info(f'Loaded {len(existing_data)} records from "{path}".')
+                    if row and row[0]:
+                        existing_names.add(row[0])
+            logging.info(f'Loaded {len(existing_names)} records from "{path}".')
         except Exception as e:
             logging.error(f"Error reading CSV: {e}")
 
-    return existing_data
+    return existing_names
 
 
-def save_to_csv(data_list: List[Dict], csv_path: str, mode: str = 'a'):
-    if not data_list:
-        return
+def load_probe_cache(cache_path: str):
+    path = Path(cache_path)
+
+    if path.exists():
+        try:
+            with open(path, mode='r', encoding='utf-8') as cache_file:
+                data = json.load(cache_file)
+            if data.get('version') == PROBE_CACHE_VERSION:
+                _probe_cache.update(data.get('files', {}))
+            logging.info(f'Loaded {len(_probe_cache)} cached probes from "{path}".')
+        except Exception as e:
+            logging.error(f"Error reading probe cache: {e}")
+
+
+def save_probe_cache(cache_path: str, seen_paths: Set[str]):
+    path = Path(cache_path)
+    tmp_path = path.with_name(path.name + '.tmp')
 
+    # 清理已不存在的文件, 避免缓存无限增长; 本次扫描到的文件肯定存在, 不必再检查
+    for key in [key for key in _probe_cache if key not in seen_paths and not os.path.exists(key)]:
+        del _probe_cache[key]
+
+    # 先写临时文件再替换, 中途崩溃不会留下半个缓存文件
+    try:
+        with open(tmp_path, mode='w', encoding='utf-8') as cache_file:
+            json.dump({'version': PROBE_CACHE_VERSION, 'files': _probe_cache}, cache_file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.error(f"Failed to write probe cache: {e}")
+
+
+def _encode_rows(rows: List[Tuple]) -> List[bytes]:
+    """Format each row as one UTF-8 encoded CSV line"""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    lines = []
+    for row in rows:
+        writer.writerow(row)
+        lines.append(buf.getvalue().encode('utf-8'))
+        buf.seek(0)
+        buf.truncate()
+    return lines
+
+
+def _write_lines(fd: int, lines: List[bytes]):
+    """Write all lines with one os.writev per batch (os.write on Windows, which has no writev)"""
+    for i in range(0, len(lines), _IOV_MAX):
+        batch = lines[i : i + _IOV_MAX]
+        written = os.writev(fd, batch) if hasattr(os, 'writev') else 0
+        if written < sum(map(len, batch)):
+            # 部分写入时, 剩余部分逐次补写
+            rest = memoryview(b''.join(batch))[written:]
+            while rest:
+                rest = rest[os.write(fd, rest) :]
+
+
+def open_csv(csv_path: str, mode: str = 'a') -> int:
     path = Path(csv_path)
 
     # 如果是 'w' 模式，或者文件不存在，我们需要写表头
     write_header = (mode == 'w') or (not path.exists()) or (path.stat().st_size == 0)
 
+    # 直接使用文件描述符, 绕过 Python 的文本层和缓冲; O_BINARY 防止 Windows 把 \r\n 再转换一次
+    flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, 'O_CLOEXEC', 0) | getattr(os, 'O_BINARY', 0)
+    if mode == 'w':
+        flags |= os.O_TRUNC
+
+    try:
+        fd = os.open(path, flags, 0o644)
+        if write_header:
+            _write_lines(fd, _encode_rows([HEADERS]))
+    except OSError as e:
+        logging.error(f"Failed to open CSV: {e}")
+        sys.exit(1)
+
+    return fd
+
+
+def save_to_csv(data_list: List[Tuple], fd: int) -> bool:
+    """Append rows to the CSV; return whether they were written"""
+    if not data_list:
+        return True
+
     try:
-        with open(path, mode, newline='', encoding='utf-8') as csv_file:
-            writer = csv.DictWriter(csv_file, fieldnames=HEADERS)
-            if write_header:
-                writer.writeheader()
-            writer.writerows(data_list)
-
-        logging.info(f'Successfully saved {len(data_list)} records to "{csv_path}" (Mode: {mode}).')
-    except IOError as e:
+        # 整批一次系统调用写入; 没有用户态缓冲,
+        # 写完即交给操作系统, 中途中断也不会丢失已完成的结果
+        _write_lines(fd, _encode_rows(data_list))
+        return True
+    except OSError as e:
         logging.error(f"Failed to write to CSV: {e}")
+        return False
+
+
+def _scan_video_files(root: Path) -> List[Tuple[Path, os.stat_result]]:
+    files = []
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(VIDEO_EXTENSIONS):
+                        # DirEntry 会缓存 stat 结果, 后续处理直接复用, 不再重复 stat
+                        try:
+                            st = entry.stat()
+                        except OSError as e:
+                            # 失效的符号链接/无权限/扫描中被删除: 只跳过该文件, 继续扫描同目录下的其他文件
+                            logging.warning(f"Cannot stat {entry.path}: {e.strerror}")
+                            continue
+                        files.append((Path(entry.path), st))
+        except OSError as e:
+            logging.warning(f"Cannot scan {e.filename}: {e.strerror}")
+    return files
 
 
-def get_video_files(directory: str) -> List[Path]:
+def get_video_files(directory: str) -> List[Tuple[Path, os.stat_result]]:
     path = Path(directory)
     logging.info(f'Scanning directory: "{path}"...')
 
     if path.is_dir():
-        extensions = {'*.mp4', '*.mkv', '*.avi', '*.mov', '*.wmv'}
-        files = []
-        for ext in extensions:
-            files.extend(list(path.rglob(ext)))
+        files = _scan_video_files(path)
     elif path.is_file():
-        files = [path]
+        files = [(path, path.stat())]
     else:
         logging.error(f'Input path "{path}" does not exist.')
         sys.exit(1)
@@ -128,56 +271,40 @@ def format_duration(seconds: float) -> str:
 
 
 def format_size(size_bytes: int) -> str:
-    """Convert to HH:MM:SS format"""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024
+    """Convert to human readable size (B/KB/MB/GB)"""
+    # bit_length 直接算出 1024 的幂次, 不用循环除
+    i = min(max(size_bytes.bit_length() - 1, 0) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (10 * i)):.1f} {_SIZE_UNITS[i]}"
 
 
 def get_res_label(width: int, height: int) -> str:
     short_side = min(width, height)
-    if short_side >= 2160:
-        return "2160p"
-    elif short_side >= 1080:
-        return "1080p"
-    elif short_side >= 720:
-        return "720p"
-    elif short_side >= 540:
-        return "540p"
-    elif short_side >= 480:
-        return "480p"
-    return f"{short_side}p"
+    i = bisect.bisect_right(_RES_BOUNDS, short_side) - 1
+    return _RES_LABELS[i] if i >= 0 else f"{short_side}p"
+
+
+@lru_cache(maxsize=4096)
+def _format_ctime(minute: int) -> str:
+    """Format a timestamp given in minutes; files copied together usually share the same minute"""
+    # time.localtime + f-string, 省去 datetime 对象构造和 strftime 的格式解析
+    tm = time.localtime(minute * 60)
+    return f"{tm.tm_year}/{tm.tm_mon:02}/{tm.tm_mday:02} {tm.tm_hour:02}:{tm.tm_min:02}"
 
 
+@lru_cache(maxsize=8192)
 def parse_filename_metadata(filename: str):
-    '''get collection & cast'''
-    match = re.search(r'^(.+?)\.(?:(?:\d{2}\.){2}\d{2}|\d{4})\.(.*)$', filename)
-    # ^(.+?)
-    #     ^             从头开始匹配
-    #     (.+?)         非贪婪匹配, 匹配字符直到遇到第一个符合后面条件的日期格式为止
-    #
-    # \.                匹配点
-    #
-    # (?:(?:\d{2}\.){2}\d{2}|\d{4})
-    #   外层的 () 是一个捕获组，用来提取完整的日期 (26.01.01)
-    #   (?:\d{2}\.){2}  匹配前两段日期
-    #   \d{2}           匹配最后一段日期
-    #   | 或
-    #   \d{4}           匹配 4 位数字 (2026)
-    #
-    # (.*)$             匹配剩下的所有内容直到行尾
-    #
-    # ?:                不捕获内容
-
-    collection = filename.split('.')[0] if '.' in filename else "Unknown"
+    '''get collection & cast (memoized per exact, case-sensitive filename; bounded to 8192 entries)'''
+    match = _FILENAME_RE.search(filename)
+
+    parts = _SEP_RE.split(filename, maxsplit=1)
+    collection = parts[0] if len(parts) > 1 else "Unknown"
     cast = "Unknown"
 
     if match:
         collection = match.group(1).replace('.', ' ')
         content_after_date = match.group(2)
 
-        matches = content_after_date.split('.')
+        matches = _SEP_RE.split(content_after_date)
         upper_matches = [m.upper() for m in matches]
         if 'XXX' in upper_matches:
             matches = matches[: upper_matches.index('XXX')]
@@ -203,102 +330,190 @@ def parse_filename_metadata(filename: str):
     return collection, cast
 
 
-def get_metadata_ffprobe(file_path: Path):
-    """
-    need to install ffmpeg/ffprobe
-    """
-    try:
-        cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', '-show_streams', str(file_path)]
-        result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8')
-        data = json.loads(result.stdout)
+def _parse_rate(rate: str) -> float:
+    """'30000/1001' -> 29.97, without eval()"""
+    num, _, den = rate.partition('/')
+    if not den:
+        return float(num)
+    # ffprobe 对未知帧率会输出 '0/0'
+    return int(num) / int(den) if int(den) else 0.0
 
-        video_stream = next((s for s in data['streams'] if s['codec_type'] == 'video'), None)
-        audio_stream = next((s for s in data['streams'] if s['codec_type'] == 'audio'), None)
-        # next(): 在找到第一个符合条件的元素后就会立即停止迭代
-        format_info = data['format']
 
-        duration = float(format_info.get('duration', 0))
-        bitrate = int(format_info.get('bit_rate', 0)) // 1000  # kbps
+def _probe_av(file_path: Path) -> Tuple:
+    """Read metadata in-process via PyAV (libavformat)"""
+    with av.open(str(file_path)) as container:
+        video_stream = container.streams.video[0] if container.streams.video else None
+        audio_stream = container.streams.audio[0] if container.streams.audio else None
 
-        width = int(video_stream.get('width', 0)) if video_stream else 0
-        height = int(video_stream.get('height', 0)) if video_stream else 0
-        fps = eval(video_stream.get('r_frame_rate', '0/1')) if video_stream else 0
-        # eval(): 执行字符串中的表达式. 将字符串 '30/1' 视为数学运算进行计算
+        duration = container.duration / av.time_base if container.duration else 0.0
+        bitrate = (container.bit_rate or 0) // 1000  # kbps
 
-        audio_bitrate = (
-            int(audio_stream.get('bit_rate', 0)) // 1000 if audio_stream and audio_stream.get('bit_rate') else 0
-        )
-        audio_channels = int(audio_stream.get('channels', 0)) if audio_stream else 0
-        audio_sample_rate = int(audio_stream.get('sample_rate', 0)) if audio_stream else 0
-
-        comment = format_info.get('tags', {}).get('comment', '')
-
-        return {
-            'duration': duration,
-            'bitrate': bitrate,
-            'width': width,
-            'height': height,
-            'fps': fps,
-            'audio_bitrate': audio_bitrate,
-            'audio_channels': audio_channels,
-            'audio_sample_rate': audio_sample_rate,
-            'comment': comment,
-        }
+        width = (video_stream.width or 0) if video_stream else 0
+        height = (video_stream.height or 0) if video_stream else 0
+        # base_rate 对应 ffprobe 的 r_frame_rate, 是 Fraction, 无需 eval
+        rate = (video_stream.base_rate or video_stream.average_rate) if video_stream else None
+        fps = float(rate) if rate else 0
+
+        audio_bitrate = (audio_stream.bit_rate or 0) // 1000 if audio_stream else 0
+        audio_channels = (audio_stream.channels or 0) if audio_stream else 0
+        audio_sample_rate = (audio_stream.sample_rate or 0) if audio_stream else 0
+
+        comment = container.metadata.get('comment', '')
+
+    return duration, bitrate, width, height, fps, audio_bitrate, audio_channels, audio_sample_rate, comment
+
+
+async def _probe_ffprobe(file_path: Path) -> Tuple:
+    """
+    need to install ffmpeg/ffprobe
+    """
+    cmd = [
+        'ffprobe',
+        '-loglevel',
+        'error',
+        '-print_format',
+        'json',
+        # 只输出用到的字段, 多音轨/字幕文件的完整输出可达几十 KB
+        '-show_entries',
+        'format=duration,bit_rate:format_tags=comment'
+        ':stream=codec_type,width,height,r_frame_rate,bit_rate,channels,sample_rate',
+        str(file_path),
+    ]
+    # 异步子进程: 等待 ffprobe 读盘时不占用线程, 可同时挂起大量探测
+    # 不解码为 str: json.loads 可以直接解析 bytes; stderr 直接丢弃, 不做缓冲
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    stdout, _ = await proc.communicate()
+    data = json_loads(stdout)
+
+    video_stream = next((s for s in data['streams'] if s['codec_type'] == 'video'), None)
+    audio_stream = next((s for s in data['streams'] if s['codec_type'] == 'audio'), None)
+    # next(): 在找到第一个符合条件的元素后就会立即停止迭代
+    format_info = data['format']
+
+    duration = float(format_info.get('duration', 0))
+    bitrate = int(format_info.get('bit_rate', 0)) // 1000  # kbps
+
+    width = int(video_stream.get('width', 0)) if video_stream else 0
+    height = int(video_stream.get('height', 0)) if video_stream else 0
+    fps = _parse_rate(video_stream.get('r_frame_rate', '0/1')) if video_stream else 0
+
+    audio_bitrate = int(audio_stream.get('bit_rate', 0)) // 1000 if audio_stream and audio_stream.get('bit_rate') else 0
+    audio_channels = int(audio_stream.get('channels', 0)) if audio_stream else 0
+    audio_sample_rate = int(audio_stream.get('sample_rate', 0)) if audio_stream else 0
+
+    comment = format_info.get('tags', {}).get('comment', '')
+
+    return duration, bitrate, width, height, fps, audio_bitrate, audio_channels, audio_sample_rate, comment
+
+
+async def get_metadata_ffprobe(file_path: Path, st: os.stat_result):
+    """
+    Use PyAV in-process if installed, otherwise fall back to the ffprobe command.
+    Results are cached by (absolute path, size, mtime).
+    Returns (duration, bitrate, width, height, fps, audio_bitrate, audio_channels, audio_sample_rate, comment).
+    """
+    key = os.path.abspath(file_path)
+    cached = _probe_cache.get(key)
+    if cached and cached['size'] == st.st_size and cached['mtime'] == st.st_mtime:
+        return cached['meta']
+
+    try:
+        if av is not None:
+            # PyAV 是阻塞调用, 放到线程池中执行
+            meta = await asyncio.to_thread(_probe_av, file_path)
+        else:
+            meta = await _probe_ffprobe(file_path)
+        _probe_cache[key] = {'size': st.st_size, 'mtime': st.st_mtime, 'meta': meta}
+        return meta
 
     except Exception as e:
         logging.warning(f"FFprobe failed for {file_path.name}: {e}")
         return None
 
 
-def process_single_video(path_video: Path, tag: str) -> Optional[Dict]:
+async def process_single_video(path_video: Path, st: os.stat_result, tag: str) -> Optional[Tuple]:
     try:
         name = path_video.name
-        size_bytes = path_video.stat().st_size
+        size_bytes = st.st_size
         size_str = format_size(size_bytes)
 
         try:
             # Windows
-            c_time = path_video.stat().st_birthtime
+            c_time = st.st_birthtime
         except AttributeError:
             # Linux/Unix
-            c_time = path_video.stat().st_mtime
-        create_time_str = datetime.fromtimestamp(c_time).strftime('%Y/%m/%d %H:%M')
+            c_time = st.st_mtime
+        create_time_str = _format_ctime(int(c_time) // 60)
 
-        collection, cast = parse_filename_metadata(path_video.stem.replace(' ', '.'))
+        collection, cast = parse_filename_metadata(path_video.stem)
         tag_to = 'PRT' if 'PRT' in name.upper() else 'XC'
 
-        meta = get_metadata_ffprobe(path_video)
+        meta = await get_metadata_ffprobe(path_video, st)
         if not meta:
             logging.warning(f"Could not extract metadata for {name}")
             return None
 
-        res_label = get_res_label(meta['width'], meta['height'])
-
-        info = {
-            # 'id': None,
-            'name': name,
-            'size': size_str,
-            'duration': format_duration(meta['duration']),
-            'collection': collection,
-            'cast': cast,
-            'tags': f'{tag}, {res_label}, {tag_to}',
-            'path': str(path_video),
-            'bitrate': f"{meta['bitrate']}kbps",
-            'create_time': create_time_str,
-            'fps': f"{meta['fps']:.2f} fps",
-            'resolution': f"{meta['width']}x{meta['height']}",
-            'audio_bitrate': f"{meta['audio_bitrate']}kbps" if meta['audio_bitrate'] else None,
-            'audio_channels': meta['audio_channels'],
-            'audio_sampling_rate': f"{meta['audio_sample_rate']/1000:.1f} kHz" if meta['audio_sample_rate'] else None,
-            'comment': meta['comment'],
-        }
-        return info
+        duration, bitrate, width, height, fps, audio_bitrate, audio_channels, audio_sample_rate, comment = meta
+        res_label = get_res_label(width, height)
+
+        # 按 HEADERS 顺序组成一行, 直接交给 csv.writer
+        return (
+            name,
+            size_str,
+            format_duration(duration),
+            collection,
+            cast,
+            f'{tag}, {res_label}, {tag_to}',  # tags
+            str(path_video),
+            f"{bitrate}kbps",
+            create_time_str,
+            f"{fps:.2f} fps",
+            f"{width}x{height}",  # resolution
+            f"{audio_bitrate}kbps" if audio_bitrate else None,
+            audio_channels,
+            f"{audio_sample_rate/1000:.1f} kHz" if audio_sample_rate else None,
+            comment,
+        )
 
     except Exception as e:
         logging.error(f"Error processing {path_video.name}: {e}")
         return None
 
 
+async def process_videos(files: List[Tuple[Path, os.stat_result]], tag: str, concurrency: int, csv_fd: int) -> int:
+    """Probe all files concurrently and append rows to the CSV as they complete; return the number saved"""
+    saved = 0
+    pending = []
+    # 固定数量的 worker 共用一个迭代器取文件, 不会为每个文件预先创建 Task
+    videos = iter(files)
+
+    with tqdm(total=len(files), unit="file", dynamic_ncols=True) as pbar:
+
+        async def worker():
+            nonlocal saved
+            for path_video, st in videos:
+                result = await process_single_video(path_video, st, tag)
+                if result:
+                    pending.append(result)
+                pbar.set_description(f"Parsed {path_video.name[:20]}...")
+                pbar.update(1)
+
+                # 边处理边追加写入, 每 50 条写一次
+                if len(pending) >= 50:
+                    if save_to_csv(pending, csv_fd):
+                        saved += len(pending)
+                    pending.clear()
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        finally:
+            # 被 Ctrl-C 取消时也写入已完成但尚未落盘的结果
+            if save_to_csv(pending, csv_fd):
+                saved += len(pending)
+
+    return saved
+
+
 def main():
     parser = argparse.ArgumentParser(description='Parse media info in directory and save as csv.')
     parser.add_argument('-i', '--input', type=str, required=True, help='Input directory path.')
@@ -307,19 +522,22 @@ def main():
     parser.add_argument(
         '-m', '--mode', type=str, default='a', choices=['a', 'w'], help='Mode: a (append/update) or w (overwrite).'
     )
-    parser.add_argument('-n', '--num', type=int, default=12, help='Number of worker threads.')
+    parser.add_argument(
+        '-n', '--num', type=int, default=12, help='Concurrency factor: up to 4x this many probes run at once.'
+    )
 
     args = parser.parse_args()
 
     setup_logging('parse.log')
     logging.info(f"Start processing. Input: {args.input}, Mode: {args.mode}")
+    load_probe_cache('parse.cache.json')
 
     all_videos = get_video_files(args.input)
     files_to_process = all_videos
 
     if args.mode == 'a':
-        existing_records = get_existing_records(args.csv)
-        files_to_process = [video for video in all_videos if video.name not in existing_records]
+        existing_names = get_existing_names(args.csv)
+        files_to_process = [video for video in all_videos if video[0].name not in existing_names]
 
         if len(files_to_process) == 0:
             logging.info("All files already recorded in CSV. Nothing to do.")
@@ -327,30 +545,23 @@ def main():
         else:
             logging.info(f"Skipping {len(all_videos) - len(files_to_process)} existing records.")
 
-    logging.info(f"Processing {len(files_to_process)} new files with {args.num} threads...")
+    logging.info(f"Processing {len(files_to_process)} new files with up to {args.num * 4} concurrent probes...")
 
     t0 = time.time()
-    info_list = []
-
-    with ThreadPoolExecutor(max_workers=args.num) as executor:
-        future_to_file = {executor.submit(process_single_video, video, args.tag): video for video in files_to_process}
-
-        with tqdm(total=len(files_to_process), unit="file", dynamic_ncols=True) as pbar:
-            for i, future in enumerate(as_completed(future_to_file)):
-                file_path = future_to_file[future]
-                try:
-                    result = future.result()
-                    if result:
-                        info_list.append(result)
-                    pbar.set_description(f"Parsed {file_path.name[:20]}...")
-                except Exception as e:
-                    logging.error(f"Thread error on {file_path}: {e}")
-                finally:
-                    pbar.update(1)
-
-    logging.info(f"Processed finished in {time.time() - t0:.1f}s. Success: {len(info_list)}/{len(files_to_process)}")
-
-    save_to_csv(info_list, args.csv, mode='a' if args.mode == 'a' and Path(args.csv).exists() else 'w')
+    mode = 'a' if args.mode == 'a' and Path(args.csv).exists() else 'w'
+
+    csv_fd = open_csv(args.csv, mode)
+    try:
+        saved = asyncio.run(process_videos(files_to_process, args.tag, args.num * 4, csv_fd))
+    except KeyboardInterrupt:
+        logging.warning("Interrupted. Rows and probe results finished so far have been kept.")
+        sys.exit(130)
+    finally:
+        os.close(csv_fd)
+        # 即使中途 Ctrl-C 或出错, 也保存已完成的探测结果
+        save_probe_cache('parse.cache.json', {os.path.abspath(path_video) for path_video, _ in all_videos})
+    logging.info(f"Processed finished in {time.time() - t0:.1f}s. Success: {saved}/{len(files_to_process)}")
+    logging.info(f'Successfully saved {saved} records to "{args.csv}" (Mode: {mode}).')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,57 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('tqdm')
+
+PARSEX = Path(__file__).resolve().parent.parent / 'parsex.py'
+
+FAKE_FFPROBE = '''#!/bin/sh
+sleep 0.2
+echo '{"streams": [{"codec_type": "video", "width": 1920, "height": 1080, "r_frame_rate": "24000/1001"}], \
+"format": {"duration": "60", "bit_rate": "4000000"}}'
+'''
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='needs a POSIX shell stub and SIGINT delivery')
+def test_sigint_mid_run_exits_and_keeps_results(tmp_path):
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    ffprobe = bin_dir / 'ffprobe'
+    ffprobe.write_text(FAKE_FFPROBE)
+    ffprobe.chmod(0o755)
+
+    videos = tmp_path / 'videos'
+    videos.mkdir()
+    for i in range(300):
+        (videos / f'Studio.26.01.01.Jane.Doe.{i}.mp4').write_text(str(i))
+
+    env = dict(os.environ, PATH=f'{bin_dir}{os.pathsep}{os.environ["PATH"]}')
+    proc = subprocess.Popen(
+        [sys.executable, str(PARSEX), '-i', str(videos), '-c', 'out.csv', '-n', '2'],
+        cwd=tmp_path,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    time.sleep(2)
+    proc.send_signal(signal.SIGINT)
+
+    try:
+        returncode = proc.wait(timeout=20)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        pytest.fail('parsex.py did not exit after SIGINT')
+
+    assert returncode == 130
+
+    cache = json.loads((tmp_path / 'parse.cache.json').read_text(encoding='utf-8'))
+    rows = (tmp_path / 'out.csv').read_text(encoding='utf-8').splitlines()[1:]
+    assert 0 < len(cache['files']) < 300
+    assert len(rows) == len(cache['files'])